@@ -7,6 +7,8 @@ This module provides the command-line interface for running the website analyzer
 
 import os
 import argparse
+import asyncio
+import logging
 import sys
 
 from . import crawler
@@ -53,6 +55,10 @@ def main():
             args.max_pages = 10
             args.timeout = 30000
             args.wait = 2
+            args.concurrency = 4
+            args.wait_until = "domcontentloaded"
+            args.audit_workers = 1
+            args.debug = False
             args.no_lighthouse = False
             args.no_screenshots = False
             return crawl_command(args)
@@ -67,9 +73,13 @@ def add_crawl_arguments(parser):
     parser.add_argument("--output", "-o", default="website_analysis", help="Output directory for screenshots and reports")
     parser.add_argument("--max-pages", "-m", type=int, default=10, help="Maximum number of pages to crawl")
     parser.add_argument("--timeout", "-t", type=int, default=30000, help="Page load timeout in milliseconds")
-    parser.add_argument("--wait", "-w", type=int, default=2, help="Additional wait time after page load (seconds)")
+    parser.add_argument("--wait", "-w", type=int, default=2, help="Additional wait time after page load before screenshots (seconds)")
+    parser.add_argument("--wait-until", choices=["commit", "domcontentloaded", "load", "networkidle"], default="domcontentloaded", help="Page load state to wait for before processing a page")
+    parser.add_argument("--concurrency", "-c", type=int, default=4, help="Number of pages to crawl in parallel")
+    parser.add_argument("--audit-workers", type=int, default=1, help="Number of Lighthouse audits to run in parallel (more than 1 speeds up the crawl but skews performance scores)")
     parser.add_argument("--no-lighthouse", action="store_true", help="Skip Lighthouse audits")
     parser.add_argument("--no-screenshots", action="store_true", help="Skip screenshots")
+    parser.add_argument("--debug", action="store_true", help="Show per-page and per-link crawl progress")
 
 
 def add_analyze_arguments(parser):
@@ -90,6 +100,11 @@ def add_analyze_pages_arguments(parser):
 
 def crawl_command(args):
     """Run the website crawler."""
+    # Crawl progress is logged; per-page details only show up with --debug
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.debug:
+        logging.getLogger("website_analyzer").setLevel(logging.DEBUG)
+    
     # Create output directory
     os.makedirs(args.output, exist_ok=True)
     
@@ -97,7 +112,11 @@ def crawl_command(args):
     web_crawler = crawler.WebCrawler(
         max_pages=args.max_pages,
         timeout=args.timeout,
-        wait_time=args.wait
+        wait_time=args.wait,
+        concurrency=args.concurrency,
+        wait_strategy=args.wait_until,
+        audit_workers=args.audit_workers,
+        debug=args.debug
     )
     
     # Initialize screenshot capturer if needed
@@ -119,11 +138,11 @@ def crawl_command(args):
     
     try:
         # Crawl the website
-        crawl_stats = web_crawler.crawl(
+        crawl_stats = asyncio.run(web_crawler.crawl(
             args.url,
             screenshot_capturer=screenshot_capturer,
             lighthouse_auditor=lighthouse_auditor
-        )
+        ))
         
         # Generate the report
         report_path = report_gen.generate(crawl_stats)
@@ -4,34 +4,111 @@ Web crawler module for the website analyzer.
 This module provides functionality for crawling websites and extracting links.
 """
 
-import time
+import asyncio
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import async_playwright, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
 
 from . import utils
 
 
+logger = logging.getLogger(__name__)
+
+# Collects the hrefs of all anchors on a page, keeping only HTTP(S) links on the given domain
+_EXTRACT_LINKS_JS = r"""(links, domain) => {
+    const isSameDomain = url => url.host.replace(/www\./g, '') === domain;
+
+    // Most links share the page's own origin; work that prefix out once so
+    // they can be accepted without parsing each one
+    const origin = isSameDomain(location) ? location.origin + '/' : null;
+
+    return links.map(link => link.href).filter(href => {
+        if (origin !== null && href.startsWith(origin)) {
+            return true;
+        }
+
+        // Skip non-HTTP links, anchors, etc.
+        if (!href.startsWith('http://') && !href.startsWith('https://')) {
+            return false;
+        }
+
+        // Skip external links
+        try {
+            return isSameDomain(new URL(href));
+        } catch (e) {
+            return false;
+        }
+    });
+}"""
+
+# Resource types that link extraction never needs; only fetched when screenshots are taken
+_BLOCKED_RESOURCE_TYPES = frozenset(["image", "media", "font", "stylesheet"])
+
+
+async def _block_unneeded_resources(route):
+    """
+    Abort requests for resources that are not needed to extract links.
+    
+    Args:
+        route: Playwright route for the intercepted request
+    """
+    if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
 class WebCrawler:
     """
     Handles crawling websites and extracting links.
     """
     
-    def __init__(self, max_pages=50, timeout=30000, wait_time=2):
+    def __init__(self, max_pages=50, timeout=30000, wait_time=2, concurrency=4,
+                 wait_strategy="domcontentloaded", audit_workers=1, debug=False):
         """
         Initialize the WebCrawler with configuration options.
         
         Args:
             max_pages (int): Maximum number of pages to crawl
             timeout (int): Page load timeout in milliseconds
-            wait_time (int): Time to wait after page load in seconds
+            wait_time (int): Time to wait after page load before taking screenshots, in seconds
+            concurrency (int): Number of pages to crawl in parallel
+            wait_strategy (str): Playwright load state to wait for when navigating
+                ("commit", "domcontentloaded", "load" or "networkidle")
+            audit_workers (int): Number of Lighthouse audits to run in parallel; audits
+                running side by side compete for CPU and skew performance scores
+            debug (bool): Whether to run per-link debug checks and logging
         """
         self.max_pages = max_pages
         self.timeout = timeout
         self.wait_time = wait_time
+        self.concurrency = max(1, concurrency)
+        self.wait_strategy = wait_strategy
+        self.audit_workers = max(1, audit_workers)
+        self.debug = debug
+        # URLs in visited_urls, queued_urls and the queue are always normalized
         self.visited_urls = set()
-        self.urls_to_visit = []
+        self.queued_urls = set()
+        
+        # The frontier queue and its lock are bound to the running event loop,
+        # so they are created at the start of each crawl
+        self.urls_to_visit = None
+        self._lock = None
+        
+        # Lighthouse audits run in this pool while crawling continues; each audit is
+        # a subprocess, so threads are enough and nothing inherits Playwright's pipes
+        self._audit_pool = None
+        
+        # Pages crawled or currently in progress, counted against max_pages
+        self._pages_reserved = 0
+        
+        # URLs held back while every slot was reserved; they refill the queue
+        # whenever an in-progress page fails and gives its slot back
+        self._overflow = deque()
     
-    def extract_links(self, page, base_url):
+    async def extract_links(self, page, base_url):
         """
         Extract all links from the current page that belong to the same domain.
         
@@ -40,51 +117,20 @@ class WebCrawler:
             base_url (str): Base URL for domain matching
             
         Returns:
-            list: List of valid links to crawl
+            list: List of valid links to crawl, already normalized
         """
-        links = page.evaluate("""() => {
-            const links = Array.from(document.querySelectorAll('a[href]'));
-            return links.map(link => link.href);
-        }""")
-        
-        valid_links = []
-        for link in links:
-            # Skip non-HTTP links, anchors, etc.
-            if not link.startswith(('http://', 'https://')):
-                continue
-                
-            # Skip external links
-            if not utils.is_same_domain(base_url, link):
-                continue
-            
-            # Skip downloadable files
-            if utils.is_downloadable_file(link):
-                continue
-                
-            # Add normalized link
-            normalized_link = utils.normalize_url(link)
-            valid_links.append(normalized_link)
-                
-        return valid_links
-    
-    def url_in_list(self, url, url_list):
-        """
-        Check if a normalized URL is in a list of URLs.
+        # Filter in the browser so only same-domain HTTP(S) links cross the CDP
+        # boundary; the domain comparison mirrors utils.is_same_domain
+        links = await page.eval_on_selector_all("a[href]", _EXTRACT_LINKS_JS, utils.get_domain(base_url))
         
-        Args:
-            url (str): URL to check
-            url_list (list): List of URLs
-            
-        Returns:
-            bool: True if URL is in list, False otherwise
-        """
-        normalized_url = utils.normalize_url(url)
-        for list_url in url_list:
-            if utils.normalize_url(list_url) == normalized_url:
-                return True
-        return False
+        # Bind the helpers locally to skip per-link attribute lookups
+        is_downloadable = utils.is_downloadable_file
+        normalize = utils.normalize_url
+        
+        # Skip downloadable files and normalize the rest
+        return [normalize(link) for link in links if not is_downloadable(link)]
     
-    def crawl(self, start_url, screenshot_capturer=None, lighthouse_auditor=None):
+    async def crawl(self, start_url, screenshot_capturer=None, lighthouse_auditor=None):
         """
         Crawl the website starting from the given URL.
         
@@ -97,120 +143,285 @@ class WebCrawler:
             dict: Statistics about the crawl
         """
         start_time = datetime.now()
-        print(f"Starting crawl of {start_url} at {start_time}")
+        logger.info("Starting crawl of %s at %s", start_url, start_time)
+        
+        self.urls_to_visit = asyncio.Queue()
+        self._lock = asyncio.Lock()
+        self._pages_reserved = 0
+        self._overflow = deque()
         
         # Normalize and add the start URL
         start_url = utils.normalize_url(start_url)
-        self.urls_to_visit.append(start_url)
+        self.urls_to_visit.put_nowait(start_url)
+        self.queued_urls.add(start_url)
         
-        # Print all normalized URLs for debugging
-        print(f"Normalized start URL: {start_url}")
+        logger.debug("Normalized start URL: %s", start_url)
         
         crawl_stats = {
             'start_time': start_time,
             'start_url': start_url,
             'pages_crawled': 0,
-            'pages': []
+            # Parallel columns, one entry per crawled page; iterate rows with
+            # zip(*crawl_stats['pages'].values())
+            'pages': {
+                'url': [],
+                'number': [],
+                'screenshots': [],
+                'lighthouse': []
+            }
         }
         
-        with sync_playwright() as playwright:
-            # Launch the browser
-            browser = playwright.chromium.launch(headless=True)
+        if lighthouse_auditor:
+            self._audit_pool = ThreadPoolExecutor(max_workers=self.audit_workers)
             
-            page_count = 0
-            while self.urls_to_visit and page_count < self.max_pages:
-                # Get the next URL to visit
-                current_url = self.urls_to_visit.pop(0)
+        try:
+            async with async_playwright() as playwright:
+                # Launch the browser
+                browser = await playwright.chromium.launch(headless=True)
                 
-                # Normalize the URL again for consistency
-                normalized_url = utils.normalize_url(current_url)
+                # Share a single context across pages; creating one per URL dominates crawl time
+                context = await browser.new_context(user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36")
                 
-                # Skip if already visited
-                if normalized_url in self.visited_urls:
-                    continue
-                
-                # Mark as visited immediately to prevent duplicates in the queue
-                self.visited_urls.add(normalized_url)
-                
-                # Skip downloadable files
-                if utils.is_downloadable_file(normalized_url):
-                    print(f"Skipping downloadable file: {normalized_url}")
-                    continue
+                # Without screenshots nothing needs to render, so skip downloading heavy resources
+                if not screenshot_capturer:
+                    await context.route("**/*", _block_unneeded_resources)
+                    
+                # Each worker drives its own page, pulling URLs from the shared queue
+                workers = [
+                    asyncio.ensure_future(
+                        self._worker(context, start_url, crawl_stats, screenshot_capturer, lighthouse_auditor)
+                    )
+                    for _ in range(self.concurrency)
+                ]
                 
-                print(f"\nProcessing page {page_count + 1}/{self.max_pages}: {normalized_url}")
+                # Wait until every queued URL has been handled, then stop the idle workers
+                await self.urls_to_visit.join()
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
                 
-                # Create a new page context
-                context = browser.new_context(user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36")
-                page = context.new_page()
+                await context.close()
+                await browser.close()
                 
-                page_info = {
-                    'url': normalized_url,
-                    'number': page_count,
-                    'screenshots': [],
-                    'lighthouse': None
-                }
+            # Collect the audits that were still running when the crawl finished
+            if self._audit_pool:
+                crawl_stats['pages']['lighthouse'] = [
+                    await self._audit_result(audit) for audit in crawl_stats['pages']['lighthouse']
+                ]
+        except BaseException:
+            # Drop audits that have not started yet so shutting down does not wait for them
+            for audit in crawl_stats['pages']['lighthouse']:
+                if audit is not None:
+                    audit.cancel()
+            raise
+        finally:
+            if self._audit_pool:
+                self._audit_pool.shutdown()
+                self._audit_pool = None
                 
-                try:
-                    # Navigate to the page
-                    response = page.goto(normalized_url, timeout=self.timeout, wait_until="networkidle")
-                    
-                    if not response or response.status >= 400:
-                        print(f"Failed to load {normalized_url}: Status code {response.status if response else 'unknown'}")
-                        context.close()
-                        continue
-                    
-                    # Wait for additional time to ensure page is fully loaded
-                    page.wait_for_timeout(self.wait_time * 1000)
-                    
-                    # Capture screenshots if a capturer is provided
-                    if screenshot_capturer:
-                        page_info['screenshots'] = screenshot_capturer.capture(page, normalized_url, page_count)
-                    
-                    # Run Lighthouse audit if an auditor is provided
-                    if lighthouse_auditor:
-                        page_info['lighthouse'] = lighthouse_auditor.audit(normalized_url, page_count)
-                    
-                    # Extract links for further crawling
-                    new_links = self.extract_links(page, start_url)
-                    
-                    # Count how many new links were added
-                    new_links_added = 0
-                    for link in new_links:
-                        normalized_link = utils.normalize_url(link)
-                        
-                        # Debug output for homepage links
-                        if normalized_link.endswith('/') and not '/' in normalized_link[8:-1]:
-                            print(f"Found homepage link: {normalized_link}")
-                        
-                        # Check if URL is already visited or in queue
-                        if normalized_link not in self.visited_urls and not self.url_in_list(normalized_link, self.urls_to_visit):
-                            self.urls_to_visit.append(normalized_link)
-                            new_links_added += 1
-                    
-                    print(f"Found {len(new_links)} links on this page, added {new_links_added} new ones to the queue")
-                    
-                    # Add page info to crawl stats
-                    crawl_stats['pages'].append(page_info)
-                    page_count += 1
-                    
-                except PlaywrightTimeoutError:
-                    print(f"Timeout while loading {normalized_url}")
-                except Exception as e:
-                    print(f"Error processing {normalized_url}: {e}")
-                finally:
-                    context.close()
-                    
-            browser.close()
-        
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
+        page_count = len(crawl_stats['pages']['url'])
         
         crawl_stats['end_time'] = end_time
         crawl_stats['duration'] = duration
         crawl_stats['pages_crawled'] = page_count
         
-        print(f"\nCrawl completed at {end_time}")
-        print(f"Duration: {duration:.2f} seconds")
-        print(f"Pages crawled: {page_count}")
+        logger.info("Crawl completed at %s", end_time)
+        logger.info("Duration: %.2f seconds", duration)
+        logger.info("Pages crawled: %d", page_count)
+        
+        return crawl_stats
+    
+    async def _worker(self, context, start_url, crawl_stats, screenshot_capturer, lighthouse_auditor):
+        """
+        Process URLs from the queue until the worker is cancelled.
+        
+        The worker reuses a single page for every navigation and only opens a
+        new one when the previous page has been closed after an error.
+        
+        Args:
+            context: Playwright browser context to open the worker's page in
+            start_url (str): Normalized starting URL, used for domain matching
+            crawl_stats (dict): Crawl statistics to record pages into
+            screenshot_capturer: Screenshot capturer instance or None
+            lighthouse_auditor: Lighthouse auditor instance or None
+        """
+        page = None
+        try:
+            while True:
+                current_url = await self.urls_to_visit.get()
+                try:
+                    if page is None or page.is_closed():
+                        page = await context.new_page()
+                    await self._process(page, current_url, start_url, crawl_stats,
+                                        screenshot_capturer, lighthouse_auditor)
+                except PlaywrightError as e:
+                    logger.warning("Error opening a page for %s: %s", current_url, e)
+                finally:
+                    self.urls_to_visit.task_done()
+        finally:
+            if page is not None and not page.is_closed():
+                await page.close()
+    
+    async def _process(self, page, normalized_url, start_url, crawl_stats, screenshot_capturer, lighthouse_auditor):
+        """
+        Load a single URL, capture its data and queue the links found on it.
+        
+        Pages are numbered in the order they are recorded, so the numbers used
+        for screenshot and Lighthouse filenames stay contiguous even when some
+        pages fail to load.
+        
+        Args:
+            page: Playwright page object to navigate with
+            normalized_url (str): Normalized URL taken from the queue
+            start_url (str): Normalized starting URL, used for domain matching
+            crawl_stats (dict): Crawl statistics to record the page into
+            screenshot_capturer: Screenshot capturer instance or None
+            lighthouse_auditor: Lighthouse auditor instance or None
+        """
+        async with self._lock:
+            # Skip if already visited
+            if normalized_url in self.visited_urls:
+                self.queued_urls.discard(normalized_url)
+                return
+                
+            # Every slot is taken, but an in-progress page may still fail; hold
+            # the URL back (still counted as queued) instead of dropping it
+            if self._pages_reserved >= self.max_pages:
+                self._overflow.append(normalized_url)
+                return
+                
+            # Mark as visited immediately to prevent duplicates in the queue
+            self.queued_urls.discard(normalized_url)
+            self.visited_urls.add(normalized_url)
+            
+            # Skip downloadable files
+            if utils.is_downloadable_file(normalized_url):
+                logger.debug("Skipping downloadable file: %s", normalized_url)
+                return
+                
+            # Reserve a slot so concurrent workers never exceed max_pages
+            self._pages_reserved += 1
+            reserved = self._pages_reserved
+            
+        logger.debug("Processing page %d/%d: %s", reserved, self.max_pages, normalized_url)
         
-        return crawl_stats
\ No newline at end of file
+        succeeded = False
+        try:
+            # Navigate to the page
+            response = await page.goto(normalized_url, timeout=self.timeout, wait_until=self.wait_strategy)
+            
+            if not response or response.status >= 400:
+                logger.warning("Failed to load %s: Status code %s", normalized_url, response.status if response else 'unknown')
+                return
+                
+            # Extract links for further crawling
+            new_links = await self.extract_links(page, start_url)
+            
+            async with self._lock:
+                # Bind the hot names locally; nothing in this loop awaits, so the
+                # reserved page count cannot change until it finishes
+                frontier = self.urls_to_visit
+                overflow = self._overflow
+                visited = self.visited_urls
+                queued = self.queued_urls
+                max_pages = self.max_pages
+                room = max_pages - self._pages_reserved
+                debug = self.debug
+                
+                # Count how many new links were added
+                new_links_added = 0
+                for link in new_links:
+                    # Debug output for homepage links; the flag short-circuits the slicing
+                    if debug and link.endswith('/') and '/' not in link[8:-1]:
+                        logger.debug("Found homepage link: %s", link)
+                        
+                    # Check if URL is already visited or in queue
+                    if link in visited or link in queued:
+                        continue
+                        
+                    # Queue links only while the pages in progress plus those queued cannot
+                    # fill max_pages; hold up to max_pages more back to replace pages that
+                    # fail, and stop there so memory stays O(max_pages)
+                    if frontier.qsize() < room:
+                        frontier.put_nowait(link)
+                    elif len(overflow) < max_pages:
+                        overflow.append(link)
+                    else:
+                        break
+                    queued.add(link)
+                    new_links_added += 1
+                    
+                # Add page info to crawl stats, one entry per column; the page's
+                # number is its row
+                pages = crawl_stats['pages']
+                page_number = len(pages['url'])
+                pages['url'].append(normalized_url)
+                pages['number'].append(page_number)
+                pages['screenshots'].append([])
+                pages['lighthouse'].append(None)
+                succeeded = True
+                
+                # Start a Lighthouse audit for the recorded page if an auditor is provided;
+                # the result is collected once the crawl has finished
+                if lighthouse_auditor:
+                    pages['lighthouse'][page_number] = self._audit_pool.submit(lighthouse_auditor.audit, normalized_url, page_number)
+                    
+            logger.debug("Found %d links on this page, added %d new ones to the queue", len(new_links), new_links_added)
+            
+            # Capture screenshots if a capturer is provided
+            if screenshot_capturer:
+                # Wait for additional time to ensure page is fully rendered
+                await page.wait_for_timeout(self.wait_time * 1000)
+                pages['screenshots'][page_number] = await screenshot_capturer.capture(page, normalized_url, page_number)
+                
+        except PlaywrightTimeoutError:
+            logger.warning("Timeout while loading %s", normalized_url)
+        except PlaywrightError as e:
+            # The page may have crashed or been left mid-navigation; close it so
+            # the worker starts over with a fresh one
+            logger.warning("Error processing %s: %s", normalized_url, e)
+            await self._close_page(page)
+        except Exception as e:
+            logger.warning("Error processing %s: %s", normalized_url, e)
+        finally:
+            # Give the slot back and let a held-back URL take its place; this runs
+            # before the worker marks its own queue item done, so the crawl
+            # cannot finish in between
+            if not succeeded:
+                async with self._lock:
+                    self._pages_reserved -= 1
+                    if self._overflow:
+                        self.urls_to_visit.put_nowait(self._overflow.popleft())
+    
+    async def _close_page(self, page):
+        """
+        Close a page that can no longer be reused, ignoring any errors.
+        
+        Args:
+            page: Playwright page object to close
+        """
+        try:
+            await page.close()
+        except PlaywrightError:
+            pass
+    
+    async def _audit_result(self, audit):
+        """
+        Wait for a Lighthouse audit submitted to the audit pool.
+        
+        Args:
+            audit: Future returned by the audit pool, or None if no audit was run
+            
+        Returns:
+            dict: Audit results or None if failed
+        """
+        if audit is None:
+            return None
+            
+        try:
+            return await asyncio.wrap_future(audit)
+        except Exception as e:
+            logger.warning("Error collecting Lighthouse audit: %s", e)
+            return None
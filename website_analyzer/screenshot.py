@@ -35,7 +35,7 @@ class ScreenshotCapturer:
         for viewport in self.viewports:
             os.makedirs(os.path.join(self.screenshots_dir, viewport["name"]), exist_ok=True)
     
-    def capture_screenshot(self, page, url, viewport, page_number):
+    async def capture_screenshot(self, page, url, viewport, page_number):
         """
         Capture a screenshot for a specific viewport and save it.
         
@@ -49,14 +49,14 @@ class ScreenshotCapturer:
             dict: Information about the screenshot or None if failed
         """
         # Set the viewport
-        page.set_viewport_size({"width": viewport["width"], "height": viewport["height"]})
+        await page.set_viewport_size({"width": viewport["width"], "height": viewport["height"]})
         
         filename = utils.create_filename_from_url(url, page_number)
         filepath = os.path.join(self.screenshots_dir, viewport["name"], f"{filename}.png")
         
         # Take full page screenshot
         try:
-            page.screenshot(path=filepath, full_page=True)
+            await page.screenshot(path=filepath, full_page=True)
             print(f"Captured {viewport['name']} screenshot: {filepath}")
             
             return {
@@ -68,7 +68,7 @@ class ScreenshotCapturer:
             print(f"Error capturing screenshot for {url} ({viewport['name']}): {e}")
             return None
     
-    def capture(self, page, url, page_number):
+    async def capture(self, page, url, page_number):
         """
         Capture screenshots for all viewports.
         
@@ -83,7 +83,7 @@ class ScreenshotCapturer:
         screenshots = []
         
         for viewport in self.viewports:
-            screenshot = self.capture_screenshot(page, url, viewport, page_number)
+            screenshot = await self.capture_screenshot(page, url, viewport, page_number)
             if screenshot:
                 screenshots.append(screenshot)
         
@@ -5,10 +5,40 @@ This module provides common utility functions used across the website analyzer,
 including URL normalization, domain checking, and filename generation.
 """
 
+import functools
 import re
+import sys
 import urllib.parse
 
 
+# URL helpers are pure and called repeatedly with the same strings while crawling
+URL_CACHE_SIZE = 8192
+
+# Common file extensions to skip during crawling
+DOWNLOADABLE_EXTENSIONS = frozenset([
+    '.pdf', '.doc', '.docx', '.ppt', '.pptx', '.xls', '.xlsx',
+    '.zip', '.rar', '.tar', '.gz', '.mp4', '.mp3', '.avi', '.mov',
+    '.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp'
+])
+_MAX_EXTENSION_LENGTH = max(len(ext) for ext in DOWNLOADABLE_EXTENSIONS)
+
+
+@functools.lru_cache(maxsize=URL_CACHE_SIZE)
+def get_domain(url):
+    """
+    Get the domain of a URL in the form used for same-domain comparisons.
+    
+    Args:
+        url (str): The URL to get the domain from
+        
+    Returns:
+        str: The lowercase network location with any 'www.' removed
+    """
+    # Handle www vs non-www
+    return urllib.parse.urlparse(url).netloc.lower().replace("www.", "")
+
+
+@functools.lru_cache(maxsize=URL_CACHE_SIZE)
 def is_same_domain(base_url, url_to_check):
     """
     Check if the URL belongs to the same domain as the base URL.
@@ -20,16 +50,48 @@ def is_same_domain(base_url, url_to_check):
     Returns:
         bool: True if the URLs have the same domain, False otherwise
     """
-    base_domain = urllib.parse.urlparse(base_url).netloc.lower()
-    check_domain = urllib.parse.urlparse(url_to_check).netloc.lower()
+    return get_domain(base_url) == get_domain(url_to_check)
+
+
+def _is_normalized(url):
+    """
+    Cheaply check whether normalize_url would return the URL unchanged.
     
-    # Handle www vs non-www
-    base_domain = base_domain.replace("www.", "")
-    check_domain = check_domain.replace("www.", "")
+    Anything unusual (fragments, params, whitespace, non-ASCII text, an empty
+    query) is reported as not normalized so that it takes the full parse.
     
-    return base_domain == check_domain
+    Args:
+        url (str): The URL to check
+        
+    Returns:
+        bool: True if the URL is already in normalized form, False otherwise
+    """
+    if not url.isascii() or url[:1] <= ' ' or url[-1:] <= ' ':
+        return False
+    if '#' in url or ';' in url or '\t' in url or '\r' in url or '\n' in url:
+        return False
+    
+    # Scheme and domain must already be lowercase, without 'www.'
+    scheme_end = url.find('://')
+    if scheme_end <= 0 or not url[:scheme_end].isalpha():
+        return False
+    path_start = url.find('/', scheme_end + 3)
+    if path_start == -1 or path_start == scheme_end + 3:
+        return False
+    head = url[:path_start]
+    if head != head.lower() or '?' in head or '[' in head or url.startswith('www.', scheme_end + 3):
+        return False
+    
+    # Only the root path may keep its trailing slash, and an empty query is dropped
+    query_start = url.find('?', path_start)
+    path_end = len(url) if query_start == -1 else query_start
+    if path_end - path_start > 1 and url[path_end - 1] == '/':
+        return False
+    
+    return query_start != len(url) - 1
 
 
+@functools.lru_cache(maxsize=URL_CACHE_SIZE)
 def normalize_url(url):
     """
     Normalize URLs to avoid duplicates with trailing slashes, www, etc.
@@ -43,6 +105,10 @@ def normalize_url(url):
     if not url:
         return ""
         
+    # Already-normalized URLs (e.g. links extracted on a previous page) come back as-is
+    if _is_normalized(url):
+        return sys.intern(url)
+        
     # Parse the URL
     parsed = urllib.parse.urlparse(url)
     
@@ -81,9 +147,11 @@ def normalize_url(url):
     if parsed.path in root_paths and not parsed.params and not parsed.query:
         normalized = f"{scheme}://{netloc}/"
     
-    return normalized
+    # Intern so the visited set, queued set and queue all share one string per URL
+    return sys.intern(normalized)
 
 
+@functools.lru_cache(maxsize=URL_CACHE_SIZE)
 def is_downloadable_file(url):
     """
     Check if the URL points to a file that should be skipped during crawling.
@@ -94,18 +162,27 @@ def is_downloadable_file(url):
     Returns:
         bool: True if the URL points to a downloadable file, False otherwise
     """
-    # Common file extensions to skip
-    file_extensions = [
-        '.pdf', '.doc', '.docx', '.ppt', '.pptx', '.xls', '.xlsx', 
-        '.zip', '.rar', '.tar', '.gz', '.mp4', '.mp3', '.avi', '.mov',
-        '.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp'
-    ]
-    
-    parsed_url = urllib.parse.urlparse(url)
-    path = parsed_url.path.lower()
-    
-    # Check if the URL path ends with any of the file extensions
-    return any(path.endswith(ext) for ext in file_extensions)
+    # Without a query, fragment or params an extension must sit in the last few characters
+    if ('.' not in url[-_MAX_EXTENSION_LENGTH:] and '?' not in url
+            and '#' not in url and ';' not in url):
+        return False
+    
+    # Drop the fragment and query without a full parse
+    path = url.split('#', 1)[0].split('?', 1)[0]
+    
+    # Skip past the scheme and domain
+    scheme_end = path.find('://')
+    if scheme_end != -1:
+        path_start = path.find('/', scheme_end + 3)
+        if path_start == -1:
+            return False
+        path = path[path_start:]
+    
+    # The extension can only appear in the last path segment, before any params
+    segment = path[path.rfind('/') + 1:].split(';', 1)[0]
+    dot = segment.rfind('.')
+    
+    return dot != -1 and segment[dot:].lower() in DOWNLOADABLE_EXTENSIONS
 
 
 def create_filename_from_url(url, page_number):